@@ -0,0 +1,11 @@
+import asyncio
+from server import backfill_sales_rollups, client
+
+async def main():
+    print("📊 Rebuilding sales rollups from orders...")
+    processed = await backfill_sales_rollups()
+    print(f"✅ Rolled up {processed} orders into sales_rollups")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
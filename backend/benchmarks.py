@@ -0,0 +1,180 @@
+"""Micro-benchmarks for hot backend functions.
+
+    python benchmarks.py                                  # run and print ops/sec
+    python benchmarks.py --save benchmark_baseline.json   # store a baseline
+    python benchmarks.py --compare benchmark_baseline.json --threshold 0.1
+
+--compare exits with status 1 when any benchmark is slower than the baseline
+by more than the threshold, so it can gate CI or a pre-merge check.
+
+benchmark_baseline.json is committed next to this file. It records the machine
+it was measured on; absolute numbers only compare meaningfully on similar
+hardware, so re-save it (and commit) when the reference machine changes.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from server import (
+    Order,
+    OrderItem,
+    Product,
+    calculate_discount_amount,
+    create_token,
+    decode_token,
+)
+
+REPEATS = 5
+MIN_RUN_SECONDS = 0.2
+
+def make_order_doc(item_count: int) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "user_email": "demo.blend4u@gmail.com",
+        "items": [
+            {
+                "product_id": str(uuid.uuid4()),
+                "product_name": f"Product {i}",
+                "quantity": 1 + i % 3,
+                "price": 299.0 + i,
+                "size": "M",
+            }
+            for i in range(item_count)
+        ],
+        "total_amount": 1499.0,
+        "currency": "INR",
+        "status": "PAID",
+        "shipping_address": {
+            "full_name": "Demo User",
+            "address_line1": "221B Baker Street",
+            "city": "Mumbai",
+            "state": "Maharashtra",
+            "postal_code": "400001",
+            "country": "India",
+            "phone": "+91 90000 00000",
+        },
+        "discount_code": "WELCOME10",
+        "discount_amount": 149.9,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def make_product_doc() -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "name": "Pastel Dream Socks",
+        "slug": "pastel-dream-socks",
+        "description": "Soft cotton socks in pastel shades. " * 5,
+        "price_inr": 299.0,
+        "price_usd": 3.99,
+        "stock": 120,
+        "images": [f"https://images.example.com/socks-{i}.jpg" for i in range(4)],
+        "category": "socks",
+        "is_active": True,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+def build_benchmarks() -> dict:
+    token = create_token(str(uuid.uuid4()), "demo.blend4u@gmail.com", "USER")
+    small_order = make_order_doc(3)
+    large_order = make_order_doc(25)
+    order_model = Order(**large_order)
+    product_doc = make_product_doc()
+    product_model = Product(**product_doc)
+    items = [OrderItem(**item) for item in large_order['items']]
+    percentage = {"discount_type": "percentage", "discount_value": 10.0}
+    fixed = {"discount_type": "fixed", "discount_value": 100.0}
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    timestamps = [(start + timedelta(minutes=i)).isoformat() for i in range(1000)]
+
+    def order_total_with_discount():
+        total = sum(item.price * item.quantity for item in items)
+        total -= calculate_discount_amount(percentage, total)
+        total -= calculate_discount_amount(fixed, total)
+        return total
+
+    return {
+        "create_token": lambda: create_token("user-id", "demo.blend4u@gmail.com", "USER"),
+        "decode_token": lambda: decode_token(token),
+        "order_construct_3_items": lambda: Order(**small_order),
+        "order_construct_25_items": lambda: Order(**large_order),
+        "order_model_dump_25_items": order_model.model_dump,
+        "product_construct": lambda: Product(**product_doc),
+        "product_model_dump": product_model.model_dump,
+        "order_total_with_discount_25_items": order_total_with_discount,
+        "fromisoformat_1000": lambda: [datetime.fromisoformat(ts) for ts in timestamps],
+    }
+
+# Best-of-REPEATS throughput in ops/sec
+def measure(func) -> float:
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < MIN_RUN_SECONDS:
+        number = max(number, int(number * MIN_RUN_SECONDS / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=REPEATS, number=number))
+    return number / best
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    print(f"\n{'benchmark':<38}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, ops in results.items():
+        if name not in baseline:
+            print(f"{name:<38}{'-':>14}{ops:>14,.0f}{'new':>10}")
+            continue
+        change = ops / baseline[name] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<38}{baseline[name]:>14,.0f}{ops:>14,.0f}{change:>+10.1%}{flag}")
+    return regressions
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run backend micro-benchmarks")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--save", type=Path, help="write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown before flagging a regression (default 0.10)")
+    args = parser.parse_args()
+
+    results = {}
+    for name, func in build_benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(func)
+        print(f"{name:<38}{results[name]:>14,.0f} ops/sec")
+
+    if args.save:
+        baseline = {"machine": machine_info(), "results": results}
+        args.save.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\nBaseline recorded on: {baseline['machine']}")
+        print(f"Current machine:      {machine_info()}")
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
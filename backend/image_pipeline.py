@@ -0,0 +1,67 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+# Widths (px) generated for every uploaded image
+IMAGE_BREAKPOINTS = (320, 640, 1280)
+# (file extension, Pillow format) pairs written at each breakpoint
+IMAGE_FORMATS = (("webp", "WEBP"), ("jpg", "JPEG"))
+IMAGE_QUALITY = 80
+# Decoded format -> extension for stored originals; anything else is rejected
+ORIGINAL_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+# Everything Pillow raises for corrupt, unsupported or oversized input
+IMAGE_DECODE_ERRORS = (OSError, ValueError, SyntaxError, Image.DecompressionBombError)
+# Pillow formats that keep transparency; the rest are flattened onto white
+ALPHA_FORMATS = ("WEBP", "PNG")
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:20]
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+def _flatten(image: Image.Image) -> Image.Image:
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+def _save_atomic(image: Image.Image, path: Path, fmt: str, quality: int):
+    # Variants are served as immutable, so never expose a partially written file;
+    # the temp name is unique because concurrent uploads of one image share `path`
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    image.save(tmp_path, fmt, quality=quality, optimize=True)
+    os.replace(tmp_path, path)
+
+# Runs in a worker process, so it only takes and returns plain values
+def generate_variants(
+    original_path: str,
+    output_dir: str,
+    digest: str,
+    breakpoints: Sequence[int] = IMAGE_BREAKPOINTS,
+    formats: Sequence[Tuple[str, str]] = IMAGE_FORMATS,
+    quality: int = IMAGE_QUALITY,
+) -> dict:
+    out = Path(output_dir)
+    variants = []
+    with Image.open(original_path) as img:
+        if img.format not in ORIGINAL_EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {img.format}")
+        extension = ORIGINAL_EXTENSIONS[img.format]
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if _has_alpha(img) else "RGB")
+        widths = sorted({min(width, img.width) for width in breakpoints})
+        for width in widths:
+            height = max(1, round(img.height * width / img.width))
+            resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+            for ext, fmt in formats:
+                filename = f"{digest}-{width}w.{ext}"
+                path = out / filename
+                if not path.exists():
+                    keep_alpha = resized.mode == "RGB" or fmt in ALPHA_FORMATS
+                    _save_atomic(resized if keep_alpha else _flatten(resized), path, fmt, quality)
+                variants.append({"width": width, "format": ext, "filename": filename})
+    return {"extension": extension, "variants": variants}
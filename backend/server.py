@@ -1,27 +1,124 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, File, UploadFile, Request, status, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, Response
+from starlette.datastructures import MutableHeaders
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, ReturnDocument, monitoring
+from pymongo.errors import DuplicateKeyError
 import os
+import re
+import csv
+import gzip
+import json
+import time
 import logging
+import threading
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 import uuid
-from datetime import datetime, timezone, timedelta
+import asyncio
+import heapq
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date, timezone, timedelta
 import bcrypt
+import brotli
 import jwt
+import numpy as np
+from email.utils import formatdate, parsedate_to_datetime
+from xml.sax.saxutils import escape
 from enum import Enum
+from image_pipeline import IMAGE_DECODE_ERRORS, content_hash, generate_variants
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
+# Connection pool counters (summed over all servers) for readiness checks
+class PoolStats(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.in_use = 0
+        self.waiting = 0
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def connection_created(self, event):
+        self._add(connections=1)
+
+    def connection_closed(self, event):
+        self._add(connections=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._add(in_use=-1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_pool_stats = PoolStats()
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000')),
+    connectTimeoutMS=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+    serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+    waitQueueTimeoutMS=int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '10000')),
+    event_listeners=[mongo_pool_stats]
+)
 db = client[os.environ['DB_NAME']]
 
+# Media storage (uploaded product images and their resized variants)
+MEDIA_DIR = Path(os.environ.get('MEDIA_DIR', ROOT_DIR / 'media'))
+# Public origin of this API (e.g. https://api.blend4u.co); stored image URLs are
+# absolute so they resolve when the storefront is served from another host
+PUBLIC_API_URL = os.environ.get('PUBLIC_API_URL', 'http://localhost:8001').rstrip('/')
+MEDIA_BASE_URL = os.environ.get('MEDIA_BASE_URL', f'{PUBLIC_API_URL}/api/media').rstrip('/')
+MAX_IMAGE_UPLOAD_BYTES = int(os.environ.get('MAX_IMAGE_UPLOAD_BYTES', 10 * 1024 * 1024))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+
+# Storefront URL used for links in the sitemap and product feeds
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:3000').rstrip('/')
+FEEDS_DIR = Path(os.environ.get('FEEDS_DIR', ROOT_DIR / 'feeds'))
+
+# Response compression and caching
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '60'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '32'))
+
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'blend4u-super-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
@@ -51,6 +148,23 @@ class Currency(str, Enum):
     INR = "INR"
     USD = "USD"
 
+class OrderView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+class AnalyticsBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+# Order statuses that count towards revenue (same set used by get_stats)
+REVENUE_STATUSES = {
+    OrderStatus.PAID.value,
+    OrderStatus.PROCESSING.value,
+    OrderStatus.SHIPPED.value,
+    OrderStatus.DELIVERED.value,
+}
+
 # ============= MODELS =============
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -62,6 +176,15 @@ class User(BaseModel):
     full_name: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class ImageVariant(BaseModel):
+    width: int
+    format: str  # "webp" or "jpg"
+    url: str
+
+class ProductImage(BaseModel):
+    original: str
+    variants: List[ImageVariant] = []
+
 class Product(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -72,9 +195,11 @@ class Product(BaseModel):
     price_usd: float
     stock: int
     images: List[str]
+    image_variants: List[ProductImage] = []  # one entry per image, in order
     category: str = "accessories"
     is_active: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None  # set by admin edits; drives sitemap lastmod
 
 class OrderItem(BaseModel):
     product_id: str
@@ -177,6 +302,22 @@ class DiscountPopupCreate(BaseModel):
     discount_code: Optional[str] = None
     display_duration: int = 5000
 
+class OrderSummaryItem(BaseModel):
+    product_name: str
+    quantity: int
+    price: float
+
+class OrderSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    items: List[OrderSummaryItem]
+    total_amount: float
+    currency: Currency
+    status: OrderStatus
+    courier_name: Optional[str] = None
+    tracking_id: Optional[str] = None
+    created_at: datetime
+
 class OrderStatusUpdate(BaseModel):
     status: OrderStatus
     courier_name: Optional[str] = None
@@ -219,6 +360,530 @@ async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+# ============= SALES ROLLUPS =============
+# Pre-aggregated sales per (day, currency), kept in `sales_rollups` with one
+# document per dimension: "total" (key ""), "product" (key = product_id) and
+# "discount" (key = discount code). Revenue metrics only include orders whose
+# status is in REVENUE_STATUSES; `orders_placed` counts every order created.
+ROLLUP_KEY_FIELDS = ("dimension", "day", "currency", "key")
+
+def _order_day(order: dict) -> str:
+    created_at = order['created_at']
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at.astimezone(timezone.utc).date().isoformat()
+
+# (filter, $inc, $set) triples describing how an order moves the rollups
+def sales_rollup_deltas(order: dict, revenue_sign: int, placed_sign: int = 0) -> list:
+    base = {"day": _order_day(order), "currency": Currency(order['currency']).value}
+    items = order.get('items', [])
+    total_inc = {}
+    if placed_sign:
+        total_inc["orders_placed"] = placed_sign
+    if revenue_sign:
+        total_inc.update({
+            "orders": revenue_sign,
+            "revenue": revenue_sign * order.get('total_amount', 0),
+            "discount_amount": revenue_sign * order.get('discount_amount', 0),
+            "items_sold": revenue_sign * sum(item['quantity'] for item in items),
+        })
+    deltas = []
+    if total_inc:
+        deltas.append(({**base, "dimension": "total", "key": ""}, total_inc, {}))
+    if not revenue_sign:
+        return deltas
+
+    for item in items:
+        deltas.append((
+            {**base, "dimension": "product", "key": item['product_id']},
+            {
+                "orders": revenue_sign,
+                "quantity": revenue_sign * item['quantity'],
+                "revenue": revenue_sign * item['price'] * item['quantity'],
+            },
+            {"product_name": item['product_name']},
+        ))
+    if order.get('discount_code'):
+        deltas.append((
+            {**base, "dimension": "discount", "key": order['discount_code'].upper()},
+            {
+                "orders": revenue_sign,
+                "discount_amount": revenue_sign * order.get('discount_amount', 0),
+                "revenue": revenue_sign * order.get('total_amount', 0),
+            },
+            {},
+        ))
+    return deltas
+
+ROLLUP_STATE_ID = "sales_rollups"
+# A crashed backfill must not divert incremental updates forever
+ROLLUP_REBUILD_MAX_SECONDS = int(os.environ.get('ROLLUP_REBUILD_MAX_SECONDS', str(6 * 3600)))
+# Lets writers that saw the rebuild marker just before it was cleared finish logging
+ROLLUP_LOG_GRACE_SECONDS = 2
+ROLLUP_ORDER_FIELDS = ("id", "created_at", "currency", "items", "total_amount", "discount_amount", "discount_code")
+
+def _rollup_ops(order: dict, revenue_sign: int, placed_sign: int = 0) -> list:
+    ops = []
+    for rollup_filter, inc, set_fields in sales_rollup_deltas(order, revenue_sign, placed_sign):
+        update = {"$inc": inc}
+        if set_fields:
+            update["$set"] = set_fields
+        ops.append(UpdateOne(rollup_filter, update, upsert=True))
+    return ops
+
+async def _rollup_state_active(flag: str) -> bool:
+    state = await db.rollup_state.find_one({"_id": ROLLUP_STATE_ID})
+    return bool(state and state.get(flag) and state['expires_at'] > datetime.now(timezone.utc).isoformat())
+
+# Queued in sales_rollups_log while a backfill runs; `version` is the order's rollup_version
+async def apply_sales_rollup(order: dict, revenue_sign: int, placed_sign: int = 0, version: int = 1):
+    try:
+        if await _rollup_state_active("rebuilding"):
+            await db.sales_rollups_log.insert_one({
+                "order": {field: order.get(field) for field in ROLLUP_ORDER_FIELDS},
+                "revenue_sign": revenue_sign,
+                "placed_sign": placed_sign,
+                "version": version,
+            })
+            return
+        ops = _rollup_ops(order, revenue_sign, placed_sign)
+        if ops:
+            await db.sales_rollups.bulk_write(ops, ordered=False)
+    except Exception:
+        # The order itself is already persisted; a backfill repairs the rollups
+        logger.exception("Failed to update sales rollups for order %s", order.get('id'))
+
+# Applies queued deltas, skipping versions the backfill scan already counted
+async def drain_sales_rollup_log(collection, seen_versions: Optional[dict] = None) -> int:
+    seen_versions = seen_versions or {}
+    drained = 0
+    while True:
+        # Popping claims the entry, so concurrent drains never apply it twice
+        entry = await db.sales_rollups_log.find_one_and_delete({}, sort=[("_id", 1)])
+        if entry is None:
+            return drained
+        drained += 1
+        if entry['version'] <= seen_versions.get(entry['order']['id'], 0):
+            continue
+        ops = _rollup_ops(entry['order'], entry['revenue_sign'], entry['placed_sign'])
+        if not ops:
+            continue
+        try:
+            await collection.bulk_write(ops, ordered=False)
+        except Exception:
+            await db.sales_rollups_log.insert_one(entry)
+            raise
+
+# Replays deltas left by a dead backfill; a running backfill's "draining" flag defers to it
+async def recover_sales_rollup_log():
+    if not await _rollup_state_active("draining"):
+        await drain_sales_rollup_log(db.sales_rollups)
+
+async def ensure_sales_rollup_indexes(collection=None):
+    collection = collection if collection is not None else db.sales_rollups
+    await collection.create_index([(field, 1) for field in ROLLUP_KEY_FIELDS], unique=True)
+
+# Rebuilds into a scratch collection, replays queued deltas, then swaps it in by rename
+async def backfill_sales_rollups() -> int:
+    now = datetime.now(timezone.utc)
+    await db.rollup_state.update_one(
+        {"_id": ROLLUP_STATE_ID},
+        {"$set": {
+            "rebuilding": True,
+            "draining": True,
+            "started_at": now.isoformat(),
+            "expires_at": (now + timedelta(seconds=ROLLUP_REBUILD_MAX_SECONDS)).isoformat(),
+        }},
+        upsert=True
+    )
+    seen_versions = {}
+    swapped = False
+    try:
+        totals = {}
+        projection = {"_id": 0, "shipping_address": 0, "user_email": 0}
+        async for order in db.orders.find({}, projection):
+            seen_versions[order['id']] = order.get('rollup_version', 0)
+            revenue_sign = 1 if order.get('status') in REVENUE_STATUSES else 0
+            for rollup_filter, inc, set_fields in sales_rollup_deltas(order, revenue_sign, 1):
+                key = tuple(rollup_filter[field] for field in ROLLUP_KEY_FIELDS)
+                doc = totals.setdefault(key, {**rollup_filter})
+                for field, value in inc.items():
+                    doc[field] = doc.get(field, 0) + value
+                doc.update(set_fields)
+
+        scratch = db.sales_rollups_rebuild
+        await scratch.drop()
+        await ensure_sales_rollup_indexes(scratch)
+        docs = list(totals.values())
+        for i in range(0, len(docs), 1000):
+            await scratch.insert_many(docs[i:i + 1000])
+        await drain_sales_rollup_log(scratch, seen_versions)
+        await scratch.rename("sales_rollups", dropTarget=True)
+        swapped = True
+    finally:
+        await db.rollup_state.update_one({"_id": ROLLUP_STATE_ID}, {"$set": {"rebuilding": False}})
+        await asyncio.sleep(ROLLUP_LOG_GRACE_SECONDS)
+        # On success this lands in the rebuilt collection; on failure it
+        # returns the queued deltas to the untouched live one
+        await drain_sales_rollup_log(db.sales_rollups, seen_versions if swapped else None)
+        await db.rollup_state.update_one({"_id": ROLLUP_STATE_ID}, {"$set": {"draining": False}})
+    return len(seen_versions)
+
+# ============= PRODUCT RECOMMENDATIONS =============
+RELATED_PRODUCTS_TOP_K = int(os.environ.get('RELATED_PRODUCTS_TOP_K', '8'))
+RELATED_PRODUCTS_REBUILD_SECONDS = int(os.environ.get('RELATED_PRODUCTS_REBUILD_SECONDS', '3600'))
+
+# "Frequently bought together": sparse co-purchase counts plus each product's top-K
+class CoPurchaseIndex:
+    def __init__(self, top_k: int = RELATED_PRODUCTS_TOP_K):
+        self.top_k = top_k
+        self.co_counts: dict = defaultdict(Counter)
+        self.related: dict = {}
+
+    def build(self, baskets: List[List[str]]):
+        baskets = [sorted(set(b)) for b in baskets]
+        product_ids = sorted({pid for b in baskets for pid in b})
+        positions = {pid: i for i, pid in enumerate(product_ids)}
+        n = len(product_ids)
+
+        # Baskets of equal size form a (baskets x size) position matrix; every
+        # ordered pair of columns is one co-purchase, encoded as i * n + j.
+        by_size = defaultdict(list)
+        for b in baskets:
+            if len(b) > 1:
+                by_size[len(b)].append([positions[pid] for pid in b])
+        codes = []
+        for size, rows in by_size.items():
+            matrix = np.array(rows, dtype=np.int64)
+            left, right = np.nonzero(~np.eye(size, dtype=bool))
+            codes.append((matrix[:, left] * n + matrix[:, right]).ravel())
+
+        self.co_counts = defaultdict(Counter)
+        if codes:
+            pairs, counts = np.unique(np.concatenate(codes), return_counts=True)
+            for i, j, count in zip((pairs // n).tolist(), (pairs % n).tolist(), counts.tolist()):
+                self.co_counts[product_ids[i]][product_ids[j]] = count
+        self.related = {pid: self._top_related(pid) for pid in self.co_counts}
+
+    def add_basket(self, product_ids: List[str]):
+        unique = sorted(set(product_ids))
+        if len(unique) < 2:
+            return
+        for pid in unique:
+            self.co_counts[pid].update(other for other in unique if other != pid)
+        for pid in unique:
+            self.related[pid] = self._top_related(pid)
+
+    def lookup(self, product_id: str, limit: Optional[int] = None) -> List[str]:
+        return self.related.get(product_id, [])[:limit]
+
+    def _top_related(self, product_id: str) -> List[str]:
+        counts = self.co_counts.get(product_id, {})
+        ranked = heapq.nsmallest(self.top_k, counts.items(), key=lambda item: (-item[1], item[0]))
+        return [pid for pid, _ in ranked]
+
+related_products_index = CoPurchaseIndex()
+
+async def rebuild_related_products():
+    global related_products_index
+    baskets = [
+        [item['product_id'] for item in o.get('items', [])]
+        async for o in db.orders.find(
+            {"status": {"$ne": OrderStatus.CANCELLED.value}},
+            {"_id": 0, "items.product_id": 1}
+        )
+    ]
+    index = CoPurchaseIndex()
+    await asyncio.to_thread(index.build, baskets)
+    related_products_index = index
+    logger.info("Built related products index from %d orders", len(baskets))
+
+async def refresh_related_products_periodically():
+    # Each worker keeps its own index; periodic rebuilds pick up orders placed
+    # through other workers and drop cancelled ones.
+    while True:
+        await asyncio.sleep(RELATED_PRODUCTS_REBUILD_SECONDS)
+        try:
+            await rebuild_related_products()
+        except Exception:
+            logger.exception("Failed to rebuild related products index")
+
+# ============= IMAGE PIPELINE =============
+MEDIA_FILENAME_RE = re.compile(r'^[0-9a-f]{20}(-\d+w)?\.[a-z0-9]+$')
+image_pool: Optional[ProcessPoolExecutor] = None
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global image_pool
+    if image_pool is None:
+        image_pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return image_pool
+
+def media_url(filename: str) -> str:
+    return f"{MEDIA_BASE_URL}/{filename}"
+
+# Uploaded images get their variants; external URLs get none
+async def resolve_image_variants(images: List[str]) -> List[dict]:
+    manifests = await db.images.find({"original": {"$in": images}}, {"_id": 0}).to_list(len(images))
+    by_original = {m['original']: m['variants'] for m in manifests}
+    return [{"original": url, "variants": by_original.get(url, [])} for url in images]
+
+# ============= RESPONSE COMPRESSION & CACHE =============
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "application/xml", "text/")
+# Preferred first when the client accepts both with equal weight
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def compress_body(body: bytes, encoding: str, precompute: bool = False) -> bytes:
+    # Cache fills can afford slightly denser settings than per-request compression;
+    # brotli 11 is avoided because it takes seconds on large catalogs
+    if encoding == "br":
+        return brotli.compress(body, quality=6 if precompute else 5)
+    return gzip.compress(body, compresslevel=9 if precompute else 6)
+
+def write_compressed_file(source: Path, destination: Path, encoding: str, chunk_size: int = 1 << 20):
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=6)
+            while chunk := src.read(chunk_size):
+                dst.write(compressor.process(chunk))
+            dst.write(compressor.finish())
+        else:
+            with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=9, mtime=0) as gz:
+                while chunk := src.read(chunk_size):
+                    gz.write(chunk)
+
+# A serialized JSON body plus its precompressed variants
+class CachedPayload:
+    def __init__(self, data):
+        self.body = json.dumps(jsonable_encoder(data), separators=(',', ':')).encode('utf-8')
+        self.encoded = {}
+        if len(self.body) >= COMPRESSION_MIN_BYTES:
+            self.encoded = {enc: compress_body(self.body, enc, precompute=True) for enc in SUPPORTED_ENCODINGS}
+        self.expires_at = time.monotonic() + RESPONSE_CACHE_TTL_SECONDS
+
+    def to_response(self, request: Request) -> Response:
+        headers = {"Vary": "Accept-Encoding"}
+        body = self.body
+        encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+        if encoding in self.encoded:
+            body = self.encoded[encoding]
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+# Per-worker LRU of public payloads; admin routes invalidate, the TTL bounds cross-worker staleness
+class ResponseCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generation = 0
+
+    def get(self, key: str) -> Optional[CachedPayload]:
+        payload = self._entries.get(key)
+        if payload is None:
+            return None
+        if payload.expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    async def set(self, key: str, data) -> CachedPayload:
+        generation = self._generation
+        # Serializing and compressing a large catalog takes long enough to stall the loop
+        payload = await asyncio.to_thread(CachedPayload, data)
+        if generation == self._generation:
+            # Skip storing if an invalidation ran while this payload was being built
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def invalidate(self, prefix: str):
+        self._generation += 1
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+response_cache = ResponseCache()
+
+# ============= CATALOG FEEDS =============
+# sitemap.xml and the merchant product feeds are written to FEEDS_DIR by
+# streaming the products collection, and only rebuilt when the admin product
+# routes change the catalog. Requests are served from the files on disk.
+FEED_FILES = {
+    "sitemap.xml": "application/xml",
+    "products.xml": "application/xml",
+    "products.csv": "text/csv",
+}
+FEED_CSV_COLUMNS = [
+    "id", "title", "description", "link", "image_link", "additional_image_links",
+    "availability", "stock", "price_inr", "price_usd", "category",
+]
+# Precompressed copies written next to each feed, served by Accept-Encoding
+FEED_ENCODINGS = {"br": ".br", "gzip": ".gz"}
+feed_task: Optional[asyncio.Task] = None
+feed_lock = asyncio.Lock()
+feed_regeneration_pending = False
+
+def absolute_url(url: str) -> str:
+    if url.startswith(('http://', 'https://')):
+        return url
+    return f"{SITE_URL}{url}"
+
+def product_feed_row(product: dict) -> dict:
+    images = [absolute_url(url) for url in product.get('images', [])]
+    return {
+        "id": product['id'],
+        "title": product['name'],
+        "description": product['description'],
+        "link": f"{SITE_URL}/product/{product['slug']}",
+        "image_link": images[0] if images else "",
+        "additional_image_links": images[1:],
+        "availability": "in_stock" if product['stock'] > 0 else "out_of_stock",
+        "stock": product['stock'],
+        "price_inr": f"{product['price_inr']:.2f}",
+        "price_usd": f"{product['price_usd']:.2f}",
+        "category": product.get('category', ''),
+    }
+
+async def generate_catalog_feeds():
+    async with feed_lock:
+        await _write_catalog_feeds()
+
+async def _write_catalog_feeds():
+    FEEDS_DIR.mkdir(parents=True, exist_ok=True)
+    # Per-process temp names: several workers may regenerate at once
+    tmp = {name: FEEDS_DIR / f".{name}.{os.getpid()}.tmp" for name in FEED_FILES}
+    with open(tmp["sitemap.xml"], "w", encoding="utf-8") as sitemap, \
+            open(tmp["products.xml"], "w", encoding="utf-8") as feed, \
+            open(tmp["products.csv"], "w", encoding="utf-8", newline="") as feed_csv:
+        sitemap.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        sitemap.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for path in ("/", "/shop", "/faq", "/contact", "/terms"):
+            sitemap.write(f"  <url><loc>{escape(SITE_URL + path)}</loc></url>\n")
+
+        feed.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        feed.write('<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n<channel>\n')
+        feed.write(f"  <title>Blend4u</title>\n  <link>{escape(SITE_URL)}</link>\n")
+        feed.write("  <description>Blend4u product catalog</description>\n")
+
+        writer = csv.DictWriter(feed_csv, fieldnames=FEED_CSV_COLUMNS)
+        writer.writeheader()
+
+        async for product in db.products.find({"is_active": True}, {"_id": 0}):
+            row = product_feed_row(product)
+            lastmod = product.get('updated_at') or product['created_at']
+            if not isinstance(lastmod, str):
+                lastmod = lastmod.isoformat()
+            sitemap.write(
+                f"  <url><loc>{escape(row['link'])}</loc><lastmod>{lastmod[:10]}</lastmod></url>\n"
+            )
+
+            feed.write("  <item>\n")
+            feed.write(f"    <g:id>{escape(row['id'])}</g:id>\n")
+            feed.write(f"    <title>{escape(row['title'])}</title>\n")
+            feed.write(f"    <description>{escape(row['description'])}</description>\n")
+            feed.write(f"    <link>{escape(row['link'])}</link>\n")
+            if row['image_link']:
+                feed.write(f"    <g:image_link>{escape(row['image_link'])}</g:image_link>\n")
+            for image in row['additional_image_links']:
+                feed.write(f"    <g:additional_image_link>{escape(image)}</g:additional_image_link>\n")
+            feed.write(f"    <g:availability>{row['availability']}</g:availability>\n")
+            feed.write(f"    <g:price>{row['price_inr']} INR</g:price>\n")
+            feed.write(f"    <price_inr>{row['price_inr']}</price_inr>\n")
+            feed.write(f"    <price_usd>{row['price_usd']}</price_usd>\n")
+            feed.write(f"    <stock>{row['stock']}</stock>\n")
+            feed.write(f"    <g:product_type>{escape(row['category'])}</g:product_type>\n")
+            feed.write("  </item>\n")
+
+            writer.writerow({**row, "additional_image_links": ",".join(row['additional_image_links'])})
+
+        sitemap.write("</urlset>\n")
+        feed.write("</channel>\n</rss>\n")
+
+    # Compressed copies are built off the loop and put in place before the
+    # plain file, so a fresh feed never lacks its encoded variants
+    for name, path in tmp.items():
+        for encoding, suffix in FEED_ENCODINGS.items():
+            encoded_tmp = path.with_name(path.name + suffix)
+            await asyncio.to_thread(write_compressed_file, path, encoded_tmp, encoding)
+            os.replace(encoded_tmp, FEEDS_DIR / (name + suffix))
+        os.replace(path, FEEDS_DIR / name)
+    logger.info("Regenerated catalog feeds in %s", FEEDS_DIR)
+
+async def _regenerate_feeds():
+    global feed_regeneration_pending
+    while True:
+        feed_regeneration_pending = False
+        try:
+            await generate_catalog_feeds()
+        except Exception:
+            logger.exception("Failed to regenerate catalog feeds")
+        if not feed_regeneration_pending:
+            break
+
+# Rebuild the feeds in the background, coalescing bursts of catalog edits
+def schedule_feed_regeneration():
+    global feed_task, feed_regeneration_pending
+    if feed_task is not None and not feed_task.done():
+        feed_regeneration_pending = True
+        return
+    feed_task = asyncio.create_task(_regenerate_feeds())
+
+async def serve_feed_file(request: Request, name: str) -> Response:
+    path = FEEDS_DIR / name
+    if not path.is_file():
+        async with feed_lock:
+            # Concurrent first requests queue here; only the first builds the feeds
+            if not path.is_file():
+                await _write_catalog_feeds()
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "public, max-age=300"}
+    encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+    encoded_path = FEEDS_DIR / (name + FEED_ENCODINGS[encoding]) if encoding else None
+    if encoded_path is not None and encoded_path.is_file():
+        path = encoded_path
+        headers["Content-Encoding"] = encoding
+    else:
+        encoding = None
+    stat = path.stat()
+    # Each encoding is a distinct representation, so it gets its own strong ETag
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+    headers["ETag"] = etag
+    headers["Last-Modified"] = formatdate(stat.st_mtime, usegmt=True)
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        not_modified = etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    else:
+        not_modified = False
+        if_modified_since = request.headers.get('if-modified-since')
+        if if_modified_since:
+            try:
+                not_modified = int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                pass
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=FEED_FILES[name], headers=headers, stat_result=stat)
+
 # ============= AUTH ROUTES =============
 @api_router.post("/auth/register", response_model=TokenResponse)
 async def register(user_data: UserRegister):
@@ -283,8 +948,7 @@ async def get_me(current_user: dict = Depends(get_current_user)):
     )
 
 # ============= PRODUCT ROUTES =============
-@api_router.get("/products", response_model=List[Product])
-async def get_products(category: Optional[str] = None):
+async def load_products_payload(category: Optional[str] = None) -> CachedPayload:
     query = {"is_active": True}
     if category:
         query["category"] = category
@@ -292,7 +956,16 @@ async def get_products(category: Optional[str] = None):
     for p in products:
         if isinstance(p['created_at'], str):
             p['created_at'] = datetime.fromisoformat(p['created_at'])
-    return products
+    products = [Product(**p) for p in products]
+    if category and not products:
+        # Unknown categories are not cached, so arbitrary query strings can't fill the cache
+        return CachedPayload(products)
+    return await response_cache.set(f"products:{category or ''}", products)
+
+@api_router.get("/products", response_model=List[Product])
+async def get_products(request: Request, category: Optional[str] = None):
+    payload = response_cache.get(f"products:{category or ''}") or await load_products_payload(category)
+    return payload.to_response(request)
 
 @api_router.get("/products/{slug}", response_model=Product)
 async def get_product(slug: str):
@@ -303,13 +976,35 @@ async def get_product(slug: str):
         product['created_at'] = datetime.fromisoformat(product['created_at'])
     return product
 
+@api_router.get("/products/{slug}/related", response_model=List[Product])
+async def get_related_products(slug: str, limit: int = Query(4, ge=1, le=RELATED_PRODUCTS_TOP_K)):
+    product = await db.products.find_one({"slug": slug, "is_active": True}, {"_id": 0, "id": 1})
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    related_ids = related_products_index.lookup(product['id'])
+    if not related_ids:
+        return []
+    products = await db.products.find({"id": {"$in": related_ids}, "is_active": True}, {"_id": 0}).to_list(len(related_ids))
+    by_id = {p['id']: p for p in products}
+    related = [by_id[pid] for pid in related_ids if pid in by_id][:limit]
+    for p in related:
+        if isinstance(p['created_at'], str):
+            p['created_at'] = datetime.fromisoformat(p['created_at'])
+    return related
+
 # ============= ADMIN PRODUCT ROUTES =============
 @api_router.post("/admin/products", response_model=Product)
 async def create_product(product_data: ProductCreate, admin: dict = Depends(require_admin)):
-    product = Product(**product_data.model_dump())
+    product = Product(
+        **product_data.model_dump(),
+        image_variants=await resolve_image_variants(product_data.images)
+    )
     doc = product.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.products.insert_one(doc)
+    response_cache.invalidate("products:")
+    schedule_feed_regeneration()
     return product
 
 @api_router.put("/admin/products/{product_id}", response_model=Product)
@@ -319,7 +1014,11 @@ async def update_product(product_id: str, product_data: ProductCreate, admin: di
         raise HTTPException(status_code=404, detail="Product not found")
     
     update_data = product_data.model_dump()
+    update_data['image_variants'] = await resolve_image_variants(product_data.images)
+    update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
     await db.products.update_one({"id": product_id}, {"$set": update_data})
+    response_cache.invalidate("products:")
+    schedule_feed_regeneration()
     
     updated = await db.products.find_one({"id": product_id}, {"_id": 0})
     if isinstance(updated['created_at'], str):
@@ -331,8 +1030,78 @@ async def delete_product(product_id: str, admin: dict = Depends(require_admin)):
     result = await db.products.update_one({"id": product_id}, {"$set": {"is_active": False}})
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    response_cache.invalidate("products:")
+    schedule_feed_regeneration()
     return {"message": "Product deleted successfully"}
 
+# ============= FEED ROUTES =============
+@api_router.get("/feeds/sitemap.xml")
+async def get_sitemap(request: Request):
+    return await serve_feed_file(request, "sitemap.xml")
+
+@api_router.get("/feeds/products.xml")
+async def get_product_feed_xml(request: Request):
+    return await serve_feed_file(request, "products.xml")
+
+@api_router.get("/feeds/products.csv")
+async def get_product_feed_csv(request: Request):
+    return await serve_feed_file(request, "products.csv")
+
+# ============= ADMIN IMAGE ROUTES =============
+@api_router.post("/admin/images", response_model=ProductImage)
+async def upload_image(file: UploadFile = File(...), admin: dict = Depends(require_admin)):
+    if not (file.content_type or '').startswith('image/'):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    data = await file.read(MAX_IMAGE_UPLOAD_BYTES + 1)
+    if len(data) > MAX_IMAGE_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+
+    digest = content_hash(data)
+    existing = await db.images.find_one({"hash": digest}, {"_id": 0})
+    if existing:
+        return existing
+
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    # The original is only given its final, format-derived name once Pillow has decoded it
+    # Unique per request: the same bytes can be uploaded twice at once (double click)
+    upload_path = MEDIA_DIR / f".{digest}.{uuid.uuid4().hex}.upload"
+    await asyncio.to_thread(upload_path.write_bytes, data)
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            get_image_pool(), generate_variants, str(upload_path), str(MEDIA_DIR), digest
+        )
+    except IMAGE_DECODE_ERRORS:
+        upload_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Invalid image file")
+    original_path = MEDIA_DIR / f"{digest}.{result['extension']}"
+    os.replace(upload_path, original_path)
+    variants = result['variants']
+
+    image = ProductImage(
+        original=media_url(original_path.name),
+        variants=[
+            ImageVariant(width=v['width'], format=v['format'], url=media_url(v['filename']))
+            for v in variants
+        ]
+    )
+    doc = image.model_dump()
+    doc['hash'] = digest
+    doc['created_at'] = datetime.now(timezone.utc).isoformat()
+    try:
+        await db.images.update_one({"hash": digest}, {"$setOnInsert": doc}, upsert=True)
+    except DuplicateKeyError:
+        # A concurrent upload of the same bytes inserted the manifest first
+        pass
+    return image
+
+@api_router.get("/media/{filename}")
+async def get_media(filename: str):
+    # Files are named by content hash, so they can be cached forever
+    path = MEDIA_DIR / filename
+    if not MEDIA_FILENAME_RE.match(filename) or not path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
 # ============= ORDER ROUTES =============
 @api_router.post("/orders", response_model=Order)
 async def create_order(order_data: OrderCreate, current_user: dict = Depends(get_current_user)):
@@ -350,10 +1119,7 @@ async def create_order(order_data: OrderCreate, current_user: dict = Depends(get
             if discount.get('max_uses') and discount.get('uses_count', 0) >= discount['max_uses']:
                 raise HTTPException(status_code=400, detail="Discount code usage limit reached")
             if total >= discount.get('min_order_amount', 0):
-                if discount['discount_type'] == 'percentage':
-                    discount_amount = total * (discount['discount_value'] / 100)
-                else:
-                    discount_amount = discount['discount_value']
+                discount_amount = calculate_discount_amount(discount, total)
                 total -= discount_amount
                 # Increment usage
                 await db.discount_codes.update_one(
@@ -375,30 +1141,77 @@ async def create_order(order_data: OrderCreate, current_user: dict = Depends(get
     doc = order.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     doc['updated_at'] = doc['updated_at'].isoformat()
+    doc['rollup_version'] = 1
     await db.orders.insert_one(doc)
-    
+
+    revenue_sign = 1 if order.status.value in REVENUE_STATUSES else 0
+    await apply_sales_rollup(doc, revenue_sign, placed_sign=1)
+    related_products_index.add_basket([item.product_id for item in order.items])
+
     return order
 
-@api_router.get("/orders", response_model=List[Order])
-async def get_user_orders(current_user: dict = Depends(get_current_user)):
-    orders = await db.orders.find({"user_id": current_user['id']}, {"_id": 0}).to_list(1000)
-    for o in orders:
-        if isinstance(o['created_at'], str):
-            o['created_at'] = datetime.fromisoformat(o['created_at'])
-        if isinstance(o['updated_at'], str):
-            o['updated_at'] = datetime.fromisoformat(o['updated_at'])
-    return orders
+# Mongo projection matching OrderSummary
+ORDER_SUMMARY_PROJECTION = {
+    "_id": 0,
+    **{field: 1 for field in OrderSummary.model_fields if field != "items"},
+    **{f"items.{field}": 1 for field in OrderSummaryItem.model_fields},
+}
 
-@api_router.get("/orders/{order_id}", response_model=Order)
-async def get_order(order_id: str, current_user: dict = Depends(get_current_user)):
-    order = await db.orders.find_one({"id": order_id, "user_id": current_user['id']}, {"_id": 0})
+# `fields` takes precedence over `view`; `id` is always included
+def order_projection(view: OrderView, fields: Optional[str]) -> dict:
+    if fields:
+        requested = {f.strip() for f in fields.split(',') if f.strip()}
+        unknown = requested - set(Order.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown order fields: {', '.join(sorted(unknown))}")
+        return {"_id": 0, "id": 1, **{f: 1 for f in requested}}
+    if view == OrderView.SUMMARY:
+        return ORDER_SUMMARY_PROJECTION
+    return {"_id": 0}
+
+def shape_order(order: dict, view: OrderView, fields: Optional[str]):
+    for key in ('created_at', 'updated_at'):
+        if isinstance(order.get(key), str):
+            order[key] = datetime.fromisoformat(order[key])
+    if fields:
+        return order
+    if view == OrderView.SUMMARY:
+        return OrderSummary(**order)
+    return Order(**order)
+
+# view/fields change the response shape, so the routes return already-validated
+# Order/OrderSummary models (or projected dicts) and document every shape
+ORDER_LIST_RESPONSES = {200: {
+    "model": Union[List[Order], List[OrderSummary], List[Dict[str, Any]]],
+    "description": "Full orders, summaries (view=summary) or only the requested fields (fields=...)",
+}}
+ORDER_RESPONSES = {200: {
+    "model": Union[Order, OrderSummary, Dict[str, Any]],
+    "description": "Full order, summary (view=summary) or only the requested fields (fields=...)",
+}}
+
+@api_router.get("/orders", response_model=None, responses=ORDER_LIST_RESPONSES)
+async def get_user_orders(
+    view: OrderView = OrderView.FULL,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    projection = order_projection(view, fields)
+    orders = await db.orders.find({"user_id": current_user['id']}, projection).to_list(1000)
+    return [shape_order(o, view, fields) for o in orders]
+
+@api_router.get("/orders/{order_id}", response_model=None, responses=ORDER_RESPONSES)
+async def get_order(
+    order_id: str,
+    view: OrderView = OrderView.FULL,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    projection = order_projection(view, fields)
+    order = await db.orders.find_one({"id": order_id, "user_id": current_user['id']}, projection)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    if isinstance(order['created_at'], str):
-        order['created_at'] = datetime.fromisoformat(order['created_at'])
-    if isinstance(order['updated_at'], str):
-        order['updated_at'] = datetime.fromisoformat(order['updated_at'])
-    return order
+    return shape_order(order, view, fields)
 
 # ============= ADMIN ORDER ROUTES =============
 @api_router.get("/admin/orders", response_model=List[Order])
@@ -419,10 +1232,22 @@ async def update_order_status(order_id: str, status_update: OrderStatusUpdate, a
     if status_update.tracking_id:
         update_data["tracking_id"] = status_update.tracking_id
     
-    result = await db.orders.update_one({"id": order_id}, {"$set": update_data})
-    if result.modified_count == 0:
+    previous = await db.orders.find_one_and_update(
+        {"id": order_id},
+        {"$set": update_data, "$inc": {"rollup_version": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not previous:
         raise HTTPException(status_code=404, detail="Order not found")
-    
+
+    was_revenue = previous['status'] in REVENUE_STATUSES
+    is_revenue = status_update.status.value in REVENUE_STATUSES
+    if was_revenue != is_revenue:
+        await apply_sales_rollup(
+            previous, 1 if is_revenue else -1, version=previous.get('rollup_version', 0) + 1
+        )
+
     order = await db.orders.find_one({"id": order_id}, {"_id": 0})
     if isinstance(order['created_at'], str):
         order['created_at'] = datetime.fromisoformat(order['created_at'])
@@ -431,6 +1256,11 @@ async def update_order_status(order_id: str, status_update: OrderStatusUpdate, a
     return order
 
 # ============= DISCOUNT CODE ROUTES =============
+def calculate_discount_amount(discount: dict, order_amount: float) -> float:
+    if discount['discount_type'] == 'percentage':
+        return order_amount * (discount['discount_value'] / 100)
+    return discount['discount_value']
+
 @api_router.post("/discount/validate")
 async def validate_discount(code: str, order_amount: float):
     discount = await db.discount_codes.find_one(
@@ -446,11 +1276,7 @@ async def validate_discount(code: str, order_amount: float):
     if order_amount < discount.get('min_order_amount', 0):
         raise HTTPException(status_code=400, detail=f"Minimum order amount is {discount['min_order_amount']}")
     
-    discount_amount = 0
-    if discount['discount_type'] == 'percentage':
-        discount_amount = order_amount * (discount['discount_value'] / 100)
-    else:
-        discount_amount = discount['discount_value']
+    discount_amount = calculate_discount_amount(discount, order_amount)
     
     return {
         "valid": True,
@@ -515,13 +1341,17 @@ async def delete_discount(discount_id: str, admin: dict = Depends(require_admin)
     return {"message": "Discount deleted successfully"}
 
 # ============= DISCOUNT POPUP ROUTES =============
-@api_router.get("/popups", response_model=List[DiscountPopup])
-async def get_active_popups():
+async def load_popups_payload() -> CachedPayload:
     popups = await db.discount_popups.find({"is_active": True}, {"_id": 0}).to_list(10)
     for p in popups:
         if isinstance(p['created_at'], str):
             p['created_at'] = datetime.fromisoformat(p['created_at'])
-    return popups
+    return await response_cache.set("popups", [DiscountPopup(**p) for p in popups])
+
+@api_router.get("/popups", response_model=List[DiscountPopup])
+async def get_active_popups(request: Request):
+    payload = response_cache.get("popups") or await load_popups_payload()
+    return payload.to_response(request)
 
 @api_router.get("/admin/popups", response_model=List[DiscountPopup])
 async def get_all_popups(admin: dict = Depends(require_admin)):
@@ -537,6 +1367,7 @@ async def create_popup(popup_data: DiscountPopupCreate, admin: dict = Depends(re
     doc = popup.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.discount_popups.insert_one(doc)
+    response_cache.invalidate("popups")
     return popup
 
 @api_router.put("/admin/popups/{popup_id}", response_model=DiscountPopup)
@@ -545,6 +1376,7 @@ async def update_popup(popup_id: str, popup_data: DiscountPopupCreate, admin: di
     result = await db.discount_popups.update_one({"id": popup_id}, {"$set": update_data})
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Popup not found")
+    response_cache.invalidate("popups")
     
     popup = await db.discount_popups.find_one({"id": popup_id}, {"_id": 0})
     if isinstance(popup['created_at'], str):
@@ -556,6 +1388,7 @@ async def delete_popup(popup_id: str, admin: dict = Depends(require_admin)):
     result = await db.discount_popups.delete_one({"id": popup_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Popup not found")
+    response_cache.invalidate("popups")
     return {"message": "Popup deleted successfully"}
 
 # ============= ADMIN USER ROUTES =============
@@ -584,9 +1417,126 @@ async def get_stats(admin: dict = Depends(require_admin)):
         "total_revenue": total_revenue
     }
 
+# ============= ADMIN ANALYTICS =============
+ANALYTICS_METRICS = ("orders_placed", "orders", "revenue", "discount_amount", "items_sold")
+
+def _analytics_period(day: str, bucket: AnalyticsBucket) -> str:
+    if bucket == AnalyticsBucket.MONTH:
+        return day[:7]
+    if bucket == AnalyticsBucket.WEEK:
+        d = date.fromisoformat(day)
+        return (d - timedelta(days=d.weekday())).isoformat()
+    return day
+
+@api_router.get("/admin/analytics")
+async def get_analytics(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    currency: Optional[Currency] = None,
+    bucket: AnalyticsBucket = AnalyticsBucket.DAY,
+    top: int = Query(10, ge=1, le=100),
+    admin: dict = Depends(require_admin)
+):
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    match = {"day": {"$gte": start.isoformat(), "$lte": end.isoformat()}}
+    if currency:
+        match["currency"] = currency.value
+
+    # Time series and per-currency totals from the "total" dimension
+    series = defaultdict(lambda: dict.fromkeys(ANALYTICS_METRICS, 0))
+    totals = defaultdict(lambda: dict.fromkeys(ANALYTICS_METRICS, 0))
+    async for row in db.sales_rollups.find({**match, "dimension": "total"}, {"_id": 0}):
+        point = series[(_analytics_period(row['day'], bucket), row['currency'])]
+        total = totals[row['currency']]
+        for metric in ANALYTICS_METRICS:
+            point[metric] += row.get(metric, 0)
+            total[metric] += row.get(metric, 0)
+
+    top_products = await db.sales_rollups.aggregate([
+        {"$match": {**match, "dimension": "product"}},
+        {"$group": {
+            "_id": {"product_id": "$key", "currency": "$currency"},
+            "product_name": {"$last": "$product_name"},
+            "orders": {"$sum": "$orders"},
+            "quantity": {"$sum": "$quantity"},
+            "revenue": {"$sum": "$revenue"},
+        }},
+        {"$match": {"quantity": {"$gt": 0}}},
+        {"$sort": {"quantity": -1, "revenue": -1}},
+        {"$limit": top},
+    ]).to_list(top)
+
+    discounts = await db.sales_rollups.aggregate([
+        {"$match": {**match, "dimension": "discount"}},
+        {"$group": {
+            "_id": {"code": "$key", "currency": "$currency"},
+            "orders": {"$sum": "$orders"},
+            "discount_amount": {"$sum": "$discount_amount"},
+            "revenue": {"$sum": "$revenue"},
+        }},
+        {"$match": {"orders": {"$gt": 0}}},
+        {"$sort": {"orders": -1}},
+    ]).to_list(1000)
+
+    def rounded(metrics: dict) -> dict:
+        return {k: round(v, 2) if isinstance(v, float) else v for k, v in metrics.items()}
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "bucket": bucket.value,
+        "currency": currency.value if currency else None,
+        "series": [
+            {"period": period, "currency": cur, **rounded(metrics)}
+            for (period, cur), metrics in sorted(series.items())
+        ],
+        "totals": {cur: rounded(metrics) for cur, metrics in sorted(totals.items())},
+        "top_products": [
+            {**p.pop('_id'), **rounded(p)} for p in top_products
+        ],
+        "discount_codes": [
+            {
+                **d.pop('_id'),
+                **rounded(d),
+                "average_order_value": round(d['revenue'] / d['orders'], 2),
+            }
+            for d in discounts
+        ],
+    }
+
 # Include router
 app.include_router(api_router)
 
+@app.middleware("http")
+async def compress_responses(request: Request, call_next):
+    response = await call_next(request)
+    content_type = response.headers.get('content-type', '')
+    if 'content-encoding' in response.headers or not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+        return response
+    # Files carry their own ETag (and feeds ship precompressed copies) and
+    # streaming bodies have no length; buffering either would defeat its purpose
+    content_length = response.headers.get('content-length')
+    if 'etag' in response.headers or content_length is None:
+        return response
+    response.headers.add_vary_header('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+    if encoding is None or int(content_length) < COMPRESSION_MIN_BYTES:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = MutableHeaders(raw=list(response.raw_headers))
+    if len(body) >= COMPRESSION_MIN_BYTES:
+        body = compress_body(body, encoding)
+        headers['content-encoding'] = encoding
+    headers['content-length'] = str(len(body))
+    compressed = Response(content=body, status_code=response.status_code, background=response.background)
+    compressed.raw_headers = headers.raw
+    return compressed
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -603,6 +1553,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def create_indexes():
+    await ensure_sales_rollup_indexes()
+    await recover_sales_rollup_log()
+    await db.images.create_index("hash", unique=True)
+    await db.images.create_index("original")
+    await db.orders.create_index("user_id")
+
+# ============= WARMUP & READINESS =============
+app_ready = False
+warmup_task: Optional[asyncio.Task] = None
+
+# Everything a worker needs from Mongo before it should take traffic
+async def warm_up():
+    global app_ready
+    # Concurrent pings check out distinct connections, opening the minimum pool
+    await asyncio.gather(*(client.admin.command('ping') for _ in range(max(1, MONGO_MIN_POOL_SIZE))))
+    await create_indexes()
+    await rebuild_related_products()
+    await load_products_payload()
+    await load_popups_payload()
+    app_ready = True
+    logger.info("Warmup complete with %d Mongo connections open", mongo_pool_stats.connections)
+
+async def _warm_up_logged():
+    try:
+        await warm_up()
+    except Exception:
+        # Stay not-ready; /health/ready starts another attempt
+        logger.exception("Warmup failed")
+
+def start_warm_up():
+    global warmup_task
+    if warmup_task is None or warmup_task.done():
+        warmup_task = asyncio.create_task(_warm_up_logged())
+
+@app.on_event("startup")
+async def warm_up_on_startup():
+    await _warm_up_logged()
+    asyncio.create_task(refresh_related_products_periodically())
+
+@app.get("/health/ready")
+async def readiness():
+    ready = app_ready
+    if ready:
+        try:
+            await asyncio.wait_for(client.admin.command('ping'), timeout=2)
+        except Exception:
+            ready = False
+    else:
+        # Retry a failed startup warmup in the background; report not-ready meanwhile
+        start_warm_up()
+    mongo = {
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "connections": mongo_pool_stats.connections,
+        "in_use": mongo_pool_stats.in_use,
+        "wait_queue": mongo_pool_stats.waiting,
+        "utilization": round(mongo_pool_stats.in_use / MONGO_MAX_POOL_SIZE, 3),
+    }
+    return JSONResponse(
+        {"status": "ready" if ready else "not_ready", "mongo": mongo},
+        status_code=200 if ready else 503
+    )
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    global app_ready
+    app_ready = False
     client.close()
+
+@app.on_event("shutdown")
+async def shutdown_image_pool():
+    if image_pool is not None:
+        image_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,25 @@
+import React from 'react';
+
+// Renders an uploaded product image through its resized variants (WebP first,
+// JPEG fallback) so the browser picks the smallest file for the layout.
+// Images without variants (external URLs) fall back to a plain <img>.
+// Pass loading="lazy" for below-the-fold images; above-the-fold ones load eagerly.
+const ResponsiveImage = ({ src, variants, sizes = '100vw', alt, ...props }) => {
+  if (!variants || variants.length === 0) {
+    return <img src={src} alt={alt} {...props} />;
+  }
+
+  const srcSet = (format) => variants
+    .filter((v) => v.format === format)
+    .map((v) => `${v.url} ${v.width}w`)
+    .join(', ');
+
+  return (
+    <picture>
+      <source type="image/webp" srcSet={srcSet('webp')} sizes={sizes} />
+      <img src={src} srcSet={srcSet('jpg')} sizes={sizes} alt={alt} {...props} />
+    </picture>
+  );
+};
+
+export default ResponsiveImage;
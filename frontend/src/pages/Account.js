@@ -15,7 +15,7 @@ const Account = () => {
 
   const fetchOrders = async () => {
     try {
-      const { data } = await api.get('/orders');
+      const { data } = await api.get('/orders', { params: { view: 'summary' } });
       setOrders(data);
     } catch (error) {
       console.error('Failed to fetch orders:', error);
@@ -3,6 +3,7 @@ import { Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { ArrowRight, Sparkles, TrendingUp, Shield } from 'lucide-react';
 import api from '../lib/api';
+import ResponsiveImage from '../components/ResponsiveImage';
 
 const Home = () => {
   const [featuredProducts, setFeaturedProducts] = useState([]);
@@ -126,8 +127,11 @@ const Home = () => {
                 <Link to={`/product/${product.slug}`}>
                   <div className="glass-panel rounded-2xl overflow-hidden hover:scale-105 transition-transform group">
                     <div className="aspect-square overflow-hidden bg-gradient-to-br from-purple-100 to-fuchsia-100">
-                      <img
+                      <ResponsiveImage
                         src={product.images[0]}
+                        variants={product.image_variants?.[0]?.variants}
+                        sizes="(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw"
+                        loading="lazy"
                         alt={product.name}
                         className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500"
                       />
@@ -1,8 +1,9 @@
 import React, { useState, useEffect } from 'react';
-import { useParams, useNavigate } from 'react-router-dom';
+import { useParams, useNavigate, Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { ShoppingCart, ArrowLeft, AlertCircle } from 'lucide-react';
 import api from '../lib/api';
+import ResponsiveImage from '../components/ResponsiveImage';
 import { useCart } from '../context/CartContext';
 
 const ProductDetail = () => {
@@ -10,12 +11,14 @@ const ProductDetail = () => {
   const navigate = useNavigate();
   const { addToCart } = useCart();
   const [product, setProduct] = useState(null);
+  const [relatedProducts, setRelatedProducts] = useState([]);
   const [selectedImage, setSelectedImage] = useState(0);
   const [quantity, setQuantity] = useState(1);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchProduct();
+    fetchRelatedProducts();
   }, [slug]);
 
   const fetchProduct = async () => {
@@ -29,6 +32,15 @@ const ProductDetail = () => {
     }
   };
 
+  const fetchRelatedProducts = async () => {
+    try {
+      const { data } = await api.get(`/products/${slug}/related`);
+      setRelatedProducts(data);
+    } catch (error) {
+      setRelatedProducts([]);
+    }
+  };
+
   const handleAddToCart = () => {
     addToCart(product, quantity);
   };
@@ -75,8 +87,10 @@ const ProductDetail = () => {
               animate={{ opacity: 1, scale: 1 }}
               className="glass-panel rounded-3xl overflow-hidden mb-4 aspect-square"
             >
-              <img
+              <ResponsiveImage
                 src={product.images[selectedImage]}
+                variants={product.image_variants?.[selectedImage]?.variants}
+                sizes="(min-width: 1024px) 50vw, 100vw"
                 alt={product.name}
                 className="w-full h-full object-cover"
                 data-testid="product-main-image"
@@ -96,7 +110,14 @@ const ProductDetail = () => {
                   }`}
                   data-testid={`thumbnail-${idx}`}
                 >
-                  <img src={img} alt={`${product.name} ${idx + 1}`} className="w-full h-full object-cover" />
+                  <ResponsiveImage
+                    src={img}
+                    variants={product.image_variants?.[idx]?.variants}
+                    sizes="20vw"
+                    loading="lazy"
+                    alt={`${product.name} ${idx + 1}`}
+                    className="w-full h-full object-cover"
+                  />
                 </motion.button>
               ))}
             </div>
@@ -181,6 +202,38 @@ const ProductDetail = () => {
             </div>
           </div>
         </div>
+
+        {/* Frequently Bought Together */}
+        {relatedProducts.length > 0 && (
+          <div className="mt-16" data-testid="related-products">
+            <h2 className="text-2xl font-bold text-slate-900 mb-6">Frequently Bought Together</h2>
+            <div className="grid grid-cols-2 lg:grid-cols-4 gap-6">
+              {relatedProducts.map((related) => (
+                <Link
+                  key={related.id}
+                  to={`/product/${related.slug}`}
+                  className="glass-panel rounded-2xl overflow-hidden hover:scale-105 transition-transform group"
+                  data-testid={`related-product-${related.slug}`}
+                >
+                  <div className="aspect-square overflow-hidden bg-gradient-to-br from-purple-100 to-fuchsia-100">
+                    <ResponsiveImage
+                      src={related.images[0]}
+                      variants={related.image_variants?.[0]?.variants}
+                      sizes="(min-width: 1024px) 25vw, 50vw"
+                      loading="lazy"
+                      alt={related.name}
+                      className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500"
+                    />
+                  </div>
+                  <div className="p-4">
+                    <h3 className="font-semibold text-slate-900 mb-1 group-hover:text-purple-600 transition-colors">{related.name}</h3>
+                    <p className="text-purple-600 font-bold">₹{related.price_inr}</p>
+                  </div>
+                </Link>
+              ))}
+            </div>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -51,6 +51,22 @@ const AdminProducts = () => {
     }
   };
 
+  const handleImageUpload = async (e) => {
+    const file = e.target.files[0];
+    if (!file) return;
+    try {
+      const body = new FormData();
+      body.append('file', file);
+      const { data } = await api.post('/admin/images', body);
+      const current = Array.isArray(formData.images) ? formData.images : formData.images.split(',').map(i => i.trim()).filter(Boolean);
+      setFormData({...formData, images: [...current, data.original].join(', ')});
+      toast.success('Image uploaded');
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to upload image');
+    }
+    e.target.value = '';
+  };
+
   const handleDelete = async (id) => {
     if (window.confirm('Delete this product?')) {
       try {
@@ -101,6 +117,7 @@ const AdminProducts = () => {
             </div>
             <textarea placeholder="Description" value={formData.description} onChange={(e) => setFormData({...formData, description: e.target.value})} required rows={3} className="w-full px-4 py-2 rounded-lg border border-purple-200 focus:border-purple-400 outline-none resize-none" data-testid="description-input" />
             <input type="text" placeholder="Image URLs (comma-separated)" value={formData.images} onChange={(e) => setFormData({...formData, images: e.target.value})} className="w-full px-4 py-2 rounded-lg border border-purple-200 focus:border-purple-400 outline-none" data-testid="images-input" />
+            <input type="file" accept="image/*" onChange={handleImageUpload} className="w-full text-sm text-slate-600" data-testid="image-upload-input" />
             <div className="flex space-x-2">
               <button type="submit" className="px-6 py-2 rounded-lg bg-emerald-600 text-white font-semibold hover:bg-emerald-700 transition-colors" data-testid="save-product-button">Save</button>
               <button type="button" onClick={resetForm} className="px-6 py-2 rounded-lg bg-slate-200 text-slate-700 font-semibold hover:bg-slate-300 transition-colors">Cancel</button>
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend is a flat set of modules (server.py, image_pipeline.py, ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,141 @@
+import asyncio
+import csv
+import gzip
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+import brotli
+from starlette.requests import Request
+
+import server
+from server import FEED_CSV_COLUMNS, FEED_ENCODINGS, product_feed_row, serve_feed_file, write_compressed_file
+
+SITEMAP_NS = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+GOOGLE_NS = {"g": "http://base.google.com/ns/1.0"}
+
+
+def make_product(**overrides):
+    product = {
+        "id": "p1",
+        "name": "Socks & <Stripes>",
+        "slug": "socks-stripes",
+        "description": 'Soft "pastel" socks',
+        "price_inr": 299.0,
+        "price_usd": 3.5,
+        "stock": 4,
+        "images": ["https://cdn.example.com/a.jpg", "/static/b.jpg"],
+        "category": "socks",
+        "is_active": True,
+        "created_at": "2024-01-02T10:00:00+00:00",
+    }
+    product.update(overrides)
+    return product
+
+
+class FakeProducts:
+    def __init__(self, docs):
+        self.docs = docs
+        self.scans = 0
+
+    def find(self, query, projection):
+        assert query == {"is_active": True}
+        self.scans += 1
+
+        async def cursor():
+            for doc in self.docs:
+                yield doc
+        return cursor()
+
+
+def use_feeds(monkeypatch, tmp_path, products):
+    collection = FakeProducts(products)
+    monkeypatch.setattr(server, "FEEDS_DIR", tmp_path)
+    monkeypatch.setattr(server, "SITE_URL", "https://blend4u.co")
+    monkeypatch.setattr(server, "db", SimpleNamespace(products=collection))
+    return collection
+
+
+def feed_request(**headers):
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_product_feed_row(monkeypatch):
+    monkeypatch.setattr(server, "SITE_URL", "https://blend4u.co")
+    row = product_feed_row(make_product(stock=0))
+    assert list(row) == FEED_CSV_COLUMNS
+    assert row["link"] == "https://blend4u.co/product/socks-stripes"
+    assert row["image_link"] == "https://cdn.example.com/a.jpg"
+    assert row["additional_image_links"] == ["https://blend4u.co/static/b.jpg"]
+    assert row["availability"] == "out_of_stock"
+    assert (row["price_inr"], row["price_usd"]) == ("299.00", "3.50")
+
+
+def test_written_feeds(tmp_path, monkeypatch):
+    use_feeds(monkeypatch, tmp_path, [
+        make_product(),
+        make_product(id="p2", slug="bag", images=[], updated_at="2024-03-04T08:00:00+00:00"),
+    ])
+    asyncio.run(server._write_catalog_feeds())
+
+    sitemap = ET.parse(tmp_path / "sitemap.xml").getroot()
+    lastmods = {
+        url.findtext("s:loc", namespaces=SITEMAP_NS): url.findtext("s:lastmod", namespaces=SITEMAP_NS)
+        for url in sitemap.findall("s:url", SITEMAP_NS)
+    }
+    assert lastmods["https://blend4u.co/shop"] is None
+    assert lastmods["https://blend4u.co/product/socks-stripes"] == "2024-01-02"  # created_at fallback
+    assert lastmods["https://blend4u.co/product/bag"] == "2024-03-04"
+
+    items = ET.parse(tmp_path / "products.xml").getroot().findall("channel/item")
+    assert items[0].findtext("title") == "Socks & <Stripes>"
+    assert items[0].findtext("g:image_link", namespaces=GOOGLE_NS) == "https://cdn.example.com/a.jpg"
+    assert items[1].find("g:image_link", GOOGLE_NS) is None
+
+    with open(tmp_path / "products.csv", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == FEED_CSV_COLUMNS
+    assert rows[0]["description"] == 'Soft "pastel" socks'
+    assert rows[0]["additional_image_links"] == "https://blend4u.co/static/b.jpg"
+
+    for name in server.FEED_FILES:
+        assert gzip.decompress((tmp_path / (name + ".gz")).read_bytes()) == (tmp_path / name).read_bytes()
+
+
+def test_concurrent_first_requests_build_feeds_once(tmp_path, monkeypatch):
+    collection = use_feeds(monkeypatch, tmp_path, [make_product()])
+
+    async def first_requests():
+        monkeypatch.setattr(server, "feed_lock", asyncio.Lock())
+        return await asyncio.gather(*[serve_feed_file(feed_request(), "sitemap.xml") for _ in range(5)])
+
+    responses = asyncio.run(first_requests())
+    assert all(r.status_code == 200 for r in responses)
+    assert collection.scans == 1
+
+
+def test_feeds_are_served_precompressed_with_per_encoding_etags(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "FEEDS_DIR", tmp_path)
+    feed = tmp_path / "products.xml"
+    feed.write_text("<item>pastel socks</item>\n" * 500)
+    for encoding, suffix in FEED_ENCODINGS.items():
+        write_compressed_file(feed, tmp_path / ("products.xml" + suffix), encoding)
+    assert gzip.decompress((tmp_path / "products.xml.gz").read_bytes()) == feed.read_bytes()
+    assert brotli.decompress((tmp_path / "products.xml.br").read_bytes()) == feed.read_bytes()
+
+    plain = asyncio.run(serve_feed_file(feed_request(), "products.xml"))
+    br = asyncio.run(serve_feed_file(feed_request(accept_encoding="br, gzip"), "products.xml"))
+    gz = asyncio.run(serve_feed_file(feed_request(accept_encoding="gzip"), "products.xml"))
+    assert "content-encoding" not in plain.headers
+    assert br.headers["content-encoding"] == "br" and str(br.path) == str(tmp_path / "products.xml.br")
+    assert gz.headers["content-encoding"] == "gzip"
+    assert len({plain.headers["etag"], br.headers["etag"], gz.headers["etag"]}) == 3
+    assert all(r.headers["vary"] == "Accept-Encoding" for r in (plain, br, gz))
+
+    revalidated = asyncio.run(serve_feed_file(
+        feed_request(accept_encoding="gzip", if_none_match=gz.headers["etag"]), "products.xml"))
+    assert revalidated.status_code == 304
+    mismatched = asyncio.run(serve_feed_file(
+        feed_request(accept_encoding="br", if_none_match=gz.headers["etag"]), "products.xml"))
+    assert mismatched.status_code == 200
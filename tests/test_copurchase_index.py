@@ -0,0 +1,53 @@
+from server import CoPurchaseIndex
+
+
+def test_build_ranks_by_count_then_id():
+    index = CoPurchaseIndex(top_k=3)
+    index.build([
+        ["a", "b"],
+        ["a", "b", "c"],
+        ["a", "c"],
+        ["a", "b"],
+        ["a", "d", "d"],
+        ["e"],
+    ])
+    assert index.lookup("a") == ["b", "c", "d"]
+    assert index.lookup("b") == ["a", "c"]
+    assert index.lookup("d") == ["a"]
+    assert index.co_counts["a"] == {"b": 3, "c": 2, "d": 1}
+    assert index.lookup("e") == []
+    assert index.lookup("unknown") == []
+
+
+def test_top_k_and_limit():
+    index = CoPurchaseIndex(top_k=2)
+    index.build([["a", "b", "c", "d"], ["a", "d"]])
+    # d has the highest count; b and c tie and are ordered by id
+    assert index.lookup("a") == ["d", "b"]
+    assert index.lookup("a", limit=1) == ["d"]
+
+
+def test_build_handles_mixed_basket_sizes():
+    index = CoPurchaseIndex()
+    index.build([["x", "y"], ["x", "y", "z"], ["w", "x", "y", "z"]])
+    assert index.co_counts["x"] == {"y": 3, "z": 2, "w": 1}
+    assert index.co_counts["w"] == {"x": 1, "y": 1, "z": 1}
+
+
+def test_add_basket_matches_batch_build():
+    baskets = [["a", "b"], ["b", "c", "a"], ["c", "new"], ["a", "b"]]
+    incremental = CoPurchaseIndex(top_k=3)
+    incremental.build(baskets[:2])
+    for basket in baskets[2:]:
+        incremental.add_basket(basket)
+
+    batch = CoPurchaseIndex(top_k=3)
+    batch.build(baskets)
+    assert incremental.related == batch.related
+    assert incremental.co_counts == batch.co_counts
+
+
+def test_add_basket_ignores_single_products():
+    index = CoPurchaseIndex()
+    index.add_basket(["a", "a"])
+    assert index.related == {}
@@ -0,0 +1,54 @@
+import pytest
+from PIL import Image
+
+from image_pipeline import IMAGE_DECODE_ERRORS, generate_variants
+
+
+def write_image(path, size, fmt):
+    Image.new("RGB", size, (200, 120, 255)).save(path, fmt)
+
+
+def test_variants_use_decoded_format_and_never_upscale(tmp_path):
+    original = tmp_path / "upload.bin"
+    write_image(original, (800, 400), "PNG")
+
+    result = generate_variants(str(original), str(tmp_path), "abc")
+
+    assert result["extension"] == "png"
+    widths = sorted({v["width"] for v in result["variants"]})
+    assert widths == [320, 640, 800]
+    for variant in result["variants"]:
+        with Image.open(tmp_path / variant["filename"]) as img:
+            assert img.width == variant["width"]
+            assert img.format == {"webp": "WEBP", "jpg": "JPEG"}[variant["format"]]
+
+
+def test_corrupt_upload_raises_decode_error(tmp_path):
+    original = tmp_path / "upload.bin"
+    original.write_bytes(b"definitely not an image")
+    with pytest.raises(IMAGE_DECODE_ERRORS):
+        generate_variants(str(original), str(tmp_path), "abc")
+
+
+def test_unsupported_format_is_rejected(tmp_path):
+    original = tmp_path / "upload.bin"
+    write_image(original, (50, 50), "BMP")
+    with pytest.raises(ValueError):
+        generate_variants(str(original), str(tmp_path), "abc")
+
+
+def test_transparency_is_kept_in_webp_and_flattened_onto_white_in_jpeg(tmp_path):
+    original = tmp_path / "upload.bin"
+    image = Image.new("RGBA", (100, 100), (0, 0, 0, 0))
+    image.paste((200, 120, 255, 255), (25, 25, 75, 75))
+    image.save(original, "PNG")
+
+    result = generate_variants(str(original), str(tmp_path), "abc")
+
+    files = {v["format"]: tmp_path / v["filename"] for v in result["variants"]}
+    with Image.open(files["webp"]) as webp:
+        assert webp.mode == "RGBA"
+        assert webp.getpixel((2, 2))[3] == 0
+    with Image.open(files["jpg"]) as jpg:
+        assert jpg.mode == "RGB"
+        assert all(channel > 245 for channel in jpg.getpixel((2, 2)))
@@ -0,0 +1,80 @@
+import pytest
+from fastapi import HTTPException
+
+from server import (
+    ORDER_SUMMARY_PROJECTION,
+    Order,
+    OrderSummary,
+    OrderView,
+    order_projection,
+    shape_order,
+)
+
+
+def make_order(**overrides):
+    order = {
+        "id": "order-1",
+        "user_id": "user-1",
+        "user_email": "demo.blend4u@gmail.com",
+        "items": [{"product_id": "p1", "product_name": "Socks", "quantity": 2, "price": 299.0, "size": "M"}],
+        "total_amount": 598.0,
+        "currency": "INR",
+        "status": "PAID",
+        "shipping_address": {
+            "full_name": "Demo User",
+            "address_line1": "221B Baker Street",
+            "city": "Mumbai",
+            "state": "Maharashtra",
+            "postal_code": "400001",
+            "country": "India",
+            "phone": "+91 90000 00000",
+        },
+        "created_at": "2024-05-31T10:00:00+00:00",
+        "updated_at": "2024-05-31T11:00:00+00:00",
+    }
+    order.update(overrides)
+    return order
+
+
+def test_summary_projection_keys():
+    assert ORDER_SUMMARY_PROJECTION == {
+        "_id": 0,
+        "id": 1,
+        "total_amount": 1,
+        "currency": 1,
+        "status": 1,
+        "courier_name": 1,
+        "tracking_id": 1,
+        "created_at": 1,
+        "items.product_name": 1,
+        "items.quantity": 1,
+        "items.price": 1,
+    }
+    assert order_projection(OrderView.SUMMARY, None) is ORDER_SUMMARY_PROJECTION
+    assert order_projection(OrderView.FULL, None) == {"_id": 0}
+
+
+def test_fields_always_include_id_and_override_view():
+    projection = order_projection(OrderView.SUMMARY, " status, total_amount ,")
+    assert projection == {"_id": 0, "id": 1, "status": 1, "total_amount": 1}
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        order_projection(OrderView.FULL, "status,password_hash,zzz")
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == "Unknown order fields: password_hash, zzz"
+
+
+def test_shape_order_per_mode():
+    full = shape_order(make_order(), OrderView.FULL, None)
+    assert type(full) is Order
+    assert full.updated_at.hour == 11
+
+    summary = shape_order(make_order(), OrderView.SUMMARY, None)
+    assert type(summary) is OrderSummary
+    assert summary.items[0].product_name == "Socks"
+
+    projected = shape_order({"id": "order-1", "created_at": "2024-05-31T10:00:00+00:00"}, OrderView.SUMMARY, "created_at")
+    assert type(projected) is dict
+    assert projected["created_at"].year == 2024
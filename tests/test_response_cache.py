@@ -0,0 +1,60 @@
+import asyncio
+import gzip
+
+import brotli
+
+import server
+from server import ResponseCache, negotiate_encoding
+
+
+def test_negotiate_encoding_prefers_brotli_and_honours_q():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_large_payloads_are_precompressed():
+    cache = ResponseCache()
+    data = [{"name": f"product {i}", "description": "soft pastel socks " * 10} for i in range(50)]
+    payload = asyncio.run(cache.set("products:", data))
+    assert gzip.decompress(payload.encoded["gzip"]) == payload.body
+    assert brotli.decompress(payload.encoded["br"]) == payload.body
+
+
+def test_lru_evicts_oldest_entry():
+    cache = ResponseCache(max_entries=2)
+    asyncio.run(cache.set("a", 1))
+    asyncio.run(cache.set("b", 2))
+    assert cache.get("a") is not None  # refreshes "a"
+    asyncio.run(cache.set("c", 3))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_expired_entries_are_dropped():
+    cache = ResponseCache()
+    payload = asyncio.run(cache.set("popups", []))
+    payload.expires_at = 0
+    assert cache.get("popups") is None
+    assert "popups" not in cache._entries
+
+
+def test_invalidation_during_fill_is_not_overwritten(monkeypatch):
+    cache = ResponseCache()
+
+    async def fill_while_invalidating():
+        original = server.CachedPayload
+
+        def slow_payload(data):
+            cache.invalidate("products:")
+            return original(data)
+
+        monkeypatch.setattr(server, "CachedPayload", slow_payload)
+        await cache.set("products:", [])
+
+    asyncio.run(fill_while_invalidating())
+    assert cache.get("products:") is None
@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+from server import AnalyticsBucket, _analytics_period, sales_rollup_deltas
+
+
+def make_order(**overrides):
+    order = {
+        "id": "order-1",
+        "created_at": "2024-05-31T22:30:00+00:00",
+        "currency": "INR",
+        "status": "PAID",
+        "items": [
+            {"product_id": "p1", "product_name": "Socks", "quantity": 2, "price": 100.0},
+            {"product_id": "p2", "product_name": "Bag", "quantity": 1, "price": 500.0},
+        ],
+        "total_amount": 630.0,
+        "discount_code": "welcome10",
+        "discount_amount": 70.0,
+    }
+    order.update(overrides)
+    return order
+
+
+def apply(totals, deltas):
+    for rollup_filter, inc, _ in deltas:
+        key = (rollup_filter["dimension"], rollup_filter["key"])
+        for field, value in inc.items():
+            totals[key][field] += value
+
+
+def test_placed_only_delta_has_no_revenue():
+    deltas = sales_rollup_deltas(make_order(status="PENDING"), revenue_sign=0, placed_sign=1)
+    assert deltas == [
+        ({"day": "2024-05-31", "currency": "INR", "dimension": "total", "key": ""}, {"orders_placed": 1}, {}),
+    ]
+
+
+def test_revenue_delta_covers_every_dimension():
+    deltas = sales_rollup_deltas(make_order(), revenue_sign=1)
+    by_key = {(f["dimension"], f["key"]): (inc, extra) for f, inc, extra in deltas}
+
+    assert by_key[("total", "")][0] == {
+        "orders": 1, "revenue": 630.0, "discount_amount": 70.0, "items_sold": 3,
+    }
+    assert by_key[("product", "p1")] == ({"orders": 1, "quantity": 2, "revenue": 200.0}, {"product_name": "Socks"})
+    assert by_key[("product", "p2")][0] == {"orders": 1, "quantity": 1, "revenue": 500.0}
+    assert by_key[("discount", "WELCOME10")][0] == {"orders": 1, "discount_amount": 70.0, "revenue": 630.0}
+
+
+def test_negative_sign_mirrors_positive():
+    order = make_order()
+    positive = sales_rollup_deltas(order, revenue_sign=1)
+    negative = sales_rollup_deltas(order, revenue_sign=-1)
+    for (f_pos, inc_pos, _), (f_neg, inc_neg, _) in zip(positive, negative):
+        assert f_pos == f_neg
+        assert inc_neg == {k: -v for k, v in inc_pos.items()}
+
+
+def test_no_discount_dimension_without_code():
+    deltas = sales_rollup_deltas(make_order(discount_code=None, discount_amount=0.0), revenue_sign=1)
+    assert all(f["dimension"] != "discount" for f, _, _ in deltas)
+
+
+def test_day_bucket_uses_utc():
+    order = make_order(created_at="2024-06-01T02:00:00+05:30")
+    (rollup_filter, _, _), = sales_rollup_deltas(order, revenue_sign=0, placed_sign=1)
+    assert rollup_filter["day"] == "2024-05-31"
+
+
+def test_revenue_cancel_revenue_round_trip():
+    order = make_order(status="PENDING")
+    totals = defaultdict(lambda: defaultdict(float))
+    apply(totals, sales_rollup_deltas(order, revenue_sign=0, placed_sign=1))  # created
+    apply(totals, sales_rollup_deltas(order, revenue_sign=1))                 # -> PAID
+    apply(totals, sales_rollup_deltas(order, revenue_sign=-1))                # -> CANCELLED
+
+    assert totals[("total", "")]["orders_placed"] == 1
+    for key, metrics in totals.items():
+        for field, value in metrics.items():
+            if field != "orders_placed":
+                assert value == 0, (key, field)
+
+    apply(totals, sales_rollup_deltas(order, revenue_sign=1))                 # -> PAID again
+    once = defaultdict(lambda: defaultdict(float))
+    apply(once, sales_rollup_deltas(order, revenue_sign=1, placed_sign=1))
+    assert totals == once
+
+
+def test_analytics_period_buckets():
+    assert _analytics_period("2024-05-29", AnalyticsBucket.DAY) == "2024-05-29"
+    # 2024-05-29 is a Wednesday; weeks start on Monday
+    assert _analytics_period("2024-05-29", AnalyticsBucket.WEEK) == "2024-05-27"
+    assert _analytics_period("2024-05-27", AnalyticsBucket.WEEK) == "2024-05-27"
+    assert _analytics_period("2024-06-02", AnalyticsBucket.WEEK) == "2024-05-27"
+    # Weeks may span a year boundary
+    assert _analytics_period("2025-01-01", AnalyticsBucket.WEEK) == "2024-12-30"
+    assert _analytics_period("2024-05-29", AnalyticsBucket.MONTH) == "2024-05"